@@ -1,4 +1,5 @@
 import os
+import shutil
 import logging as log
 from cfbs.utils import (
     canonify,
@@ -15,7 +16,7 @@ from cfbs.utils import (
     user_error,
     write_json,
 )
-from cfbs.pretty import pretty, pretty_file
+from cfbs.pretty import LazyPretty, pretty_file
 
 AVAILABLE_BUILD_STEPS = {
     "copy": 2,
@@ -37,6 +38,23 @@ def init_out_folder():
     mkdir("out/steps")
 
 
+def _walk_files(top):
+    """Yield (directory, file names) for top and its subdirectories, top-down
+
+    Like os.walk(), but uses the file types os.scandir() already knows from
+    the directory listing, and skips symlinks, like rsync -r.
+    """
+    files, subdirs = [], []
+    for entry in os.scandir(top):
+        if entry.is_file(follow_symlinks=False):
+            files.append(entry.name)
+        elif entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+    yield top, files
+    for subdir in subdirs:
+        yield from _walk_files(subdir)
+
+
 def _generate_augment(module_name, input_data):
     """
     Generate augment from input data.
@@ -139,7 +157,13 @@ def _perform_build_step(module, step, max_length):
         merged = read_json(defjson)
         if not merged:
             merged = {}
-        for root, _, files in os.walk(src):
+        # Copy the files in Python instead of running rsync for each of them:
+        for root, files in _walk_files(src):
+            target = os.path.normpath(
+                os.path.join(destination, dstarg, os.path.relpath(root, src))
+            )
+            if any(f != "def.json" for f in files):
+                mkdir(target)
             for f in files:
                 if f == "def.json":
                     extra = read_json(os.path.join(root, f))
@@ -147,9 +171,9 @@ def _perform_build_step(module, step, max_length):
                         merged = merge_json(merged, extra)
                 else:
                     s = os.path.join(root, f)
-                    d = os.path.join(destination, dstarg, root[len(src) :], f)
+                    d = os.path.join(target, f)
                     log.debug("Copying '%s' to '%s'" % (s, d))
-                    cp(s, d)
+                    shutil.copy(s, d)
         write_json(defjson, merged)
     elif operation == "input":
         src, dst = args
@@ -173,18 +197,18 @@ def _perform_build_step(module, step, max_length):
             return
         extras, original = read_json(src), read_json(dst)
         extras = _generate_augment(module["name"], extras)
-        log.debug("Generated augment: %s", pretty(extras))
+        log.debug("Generated augment: %s", LazyPretty(extras))
         if not extras:
             user_error(
                 "Input data '%s' is incomplete: Skipping build step."
                 % os.path.basename(src)
             )
         if original:
-            log.debug("Original def.json: %s", pretty(original))
+            log.debug("Original def.json: %s", LazyPretty(original))
             merged = merge_json(original, extras)
         else:
             merged = extras
-        log.debug("Merged def.json: %s", pretty(merged))
+        log.debug("Merged def.json: %s", LazyPretty(merged))
         write_json(dst, merged)
     elif operation == "policy_files":
         files = []
@@ -204,23 +228,23 @@ def _perform_build_step(module, step, max_length):
                 )
         print("%s policy_files '%s'" % (prefix, "' '".join(files) if files else ""))
         augment = {"inputs": files}
-        log.debug("Generated augment: %s" % pretty(augment))
+        log.debug("Generated augment: %s", LazyPretty(augment))
         path = os.path.join(destination, "def.json")
         original = read_json(path)
-        log.debug("Original def.json: %s" % pretty(original))
+        log.debug("Original def.json: %s", LazyPretty(original))
         merged = merge_json(original, augment) if original else augment
-        log.debug("Merged def.json: %s", pretty(merged))
+        log.debug("Merged def.json: %s", LazyPretty(merged))
         write_json(path, merged)
     elif operation == "bundles":
         bundles = args
         print("%s bundles '%s'" % (prefix, "' '".join(bundles) if bundles else ""))
         augment = {"vars": {"control_common_bundlesequence_end": bundles}}
-        log.debug("Generated augment: %s" % pretty(augment))
+        log.debug("Generated augment: %s", LazyPretty(augment))
         path = os.path.join(destination, "def.json")
         original = read_json(path)
-        log.debug("Original def.json: %s" % pretty(original))
+        log.debug("Original def.json: %s", LazyPretty(original))
         merged = merge_json(original, augment) if original else augment
-        log.debug("Merged def.json: %s", pretty(merged))
+        log.debug("Merged def.json: %s", LazyPretty(merged))
         write_json(path, merged)
     else:
         user_error("Unknown build step operation: %s" % operation)
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import os
-import copy
 import glob
 import logging as log
 from collections import OrderedDict
@@ -10,7 +9,8 @@ from cfbs.utils import (
     user_error,
     read_file,
     write_json,
-    load_bundlenames,
+    copy_json,
+    loads_bundlenames,
 )
 from cfbs.internal_file_management import (
     clone_url_repo,
@@ -29,9 +29,8 @@ class CFBSReturnWithoutCommit(Exception):
         self.retval = r
 
 
-def _has_autorun_tag(filename):
-    assert os.path.isfile(filename)
-    content = read_file(filename)
+def _has_autorun_tag(content):
+    assert content is not None
 
     return (
         "meta:" in content
@@ -74,14 +73,25 @@ class CFBSConfig(CFBSJson):
         self._reload_args = (filename, index, non_interactive)
         super().__init__(path=filename, index_argument=index)
         self.non_interactive = non_interactive
+        self._longest_module_name = None
 
     def save(self):
         data = pretty(self._data, CFBS_DEFAULT_SORTING_RULES) + "\n"
         with open(self.path, "w") as f:
             f.write(data)
+        self._longest_module_name = None
 
     def longest_module_name(self) -> int:
-        return max((len(m["name"]) for m in self["build"])) if self.get("build") else 0
+        """Length of the longest module name in build
+
+        Remembered until the config is saved.
+        """
+        if self._longest_module_name is None:
+            build = self.get("build")
+            self._longest_module_name = (
+                max(len(m["name"]) for m in build) if build else 0
+            )
+        return self._longest_module_name
 
     def add_with_dependencies(self, module, remote_config=None, dependent=None):
         if type(module) is list:
@@ -231,15 +241,15 @@ class CFBSConfig(CFBSJson):
         module["steps"].append(step)
         log.debug("Added build step '%s' for module '%s'" % (step, name))
 
-    def _add_bundles_build_step(self, module, policy_files):
+    def _add_bundles_build_step(self, module, policies):
         name = module["name"]
         choices = []
         first = True
         prompt_str = "Which bundle should be evaluated (added to bundle sequence)?"
 
-        for file in policy_files:
+        for file, content in policies.items():
             log.debug("Looking for bundles in policy file '%s'" % file)
-            for bundle in load_bundlenames(file):
+            for bundle in loads_bundlenames(content):
                 log.debug("Found bundle '%s'" % bundle)
                 choices.append(bundle)
                 prompt_str += "\n%2d. %s:%s" % (len(choices), file, bundle)
@@ -286,8 +296,12 @@ class CFBSConfig(CFBSJson):
             pattern = "%s/**/*.cf" % name
             policy_files = glob.glob(pattern, recursive=True)
 
-        for file in policy_files:
-            if _has_autorun_tag(file):
+        # Read each policy file once, the contents are needed both for the
+        # autorun check and for finding bundles:
+        policies = OrderedDict((file, read_file(file)) for file in policy_files)
+
+        for file, content in policies.items():
+            if _has_autorun_tag(content):
                 log.warning(
                     "Found bundle tagged with autorun in local policy file '%s': "
                     % file
@@ -296,7 +310,7 @@ class CFBSConfig(CFBSJson):
                 # TODO: Support adding local modules with autorun tag
 
         self._add_policy_files_build_step(module)
-        self._add_bundles_build_step(module, policy_files)
+        self._add_bundles_build_step(module, policies)
 
     def _add_without_dependencies(self, modules):
         assert modules
@@ -408,7 +422,7 @@ class CFBSConfig(CFBSJson):
                     YES_NO_CHOICES,
                     "no",
                 ).lower() in ("yes", "y"):
-                    input_data = copy.deepcopy(module["input"])
+                    input_data = copy_json(module["input"])
                     self.input_command(name, input_data)
                     write_json(input_path, input_data)
                     files.append(input_path)
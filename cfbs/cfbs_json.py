@@ -52,6 +52,7 @@ class CFBSJson:
         self.path = path
         self.url = url
         self.url_commit = url_commit
+        self._warned_about_unknown_keys = False
         if data:
             self._data = data
         else:
@@ -69,8 +70,9 @@ class CFBSJson:
         """Read-only access to the original data, for validation purposes"""
         return deepcopy(self._data)
 
-    def _find_all_module_objects(self):
-        data = self.raw_data
+    def _find_all_module_objects(self, data=None):
+        if data is None:
+            data = self.raw_data
         modules = []
         if "index" in data and type(data["index"]) in (dict, OrderedDict):
             modules += data["index"].values()
@@ -88,9 +90,20 @@ class CFBSJson:
         validation only produces warnings (we want cfbs to still work),
         and is run for various cfbs commands, not just cfbs build / validate.
         For the more complete validation, see validate.py.
+
+        Only the first call does anything, the same warnings would just be
+        repeated on subsequent calls. When warnings are not going to be logged
+        anyway, the config is not traversed at all.
         """
 
-        data = self.raw_data
+        if self._warned_about_unknown_keys:
+            return
+        if not log.getLogger().isEnabledFor(log.WARNING):
+            return
+        self._warned_about_unknown_keys = True
+
+        # Only reading, so no need for the (deep) copy in raw_data:
+        data = self._data
         if not data:
             return  # No data, no unknown keys
 
@@ -101,7 +114,7 @@ class CFBSJson:
                     + "Is it a typo? If not, try upgrading cfbs:\n"
                     + "pip3 install --upgrade cfbs"
                 )
-        for module in self._find_all_module_objects():
+        for module in self._find_all_module_objects(data):
             for key in module:
                 if key not in MODULE_KEYS:
                     log.warning(
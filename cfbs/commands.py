@@ -4,27 +4,29 @@ in main.py for -h/--help/help.
 """
 import os
 import re
-import copy
 import logging as log
 import json
 import sys
 import functools
+import threading
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from cfbs.args import get_args
 
 from cfbs.utils import (
-    cfbs_dir,
     cfbs_filename,
     is_cfbs_repo,
+    read_file,
     read_json,
     user_error,
     strip_right,
-    pad_right,
     ProgrammerError,
-    get_json,
+    parse_json,
     write_json,
     rm,
     cp,
+    cp_tree,
+    copy_json,
     sh,
     is_a_commit_hash,
 )
@@ -32,6 +34,7 @@ from cfbs.utils import (
 from cfbs.args import get_args
 from cfbs.pretty import (
     pretty,
+    LazyPretty,
     pretty_check_file,
     pretty_file,
     CFBS_DEFAULT_SORTING_RULES,
@@ -50,10 +53,11 @@ from cfbs.internal_file_management import (
     local_module_copy,
     SUPPORTED_ARCHIVES,
 )
-from cfbs.index import _VERSION_INDEX, Index
+from cfbs.index import Index, get_version_index
 from cfbs.git import (
     is_git_repo,
     git_commit,
+    git_clone_local,
     git_get_config,
     git_set_config,
     git_init,
@@ -71,6 +75,17 @@ class InputDataUpdateFailed(Exception):
 
 
 _MODULES_URL = "https://archive.build.cfengine.com/modules"
+_MASTERFILES_REMOTE = "https://github.com/cfengine/masterfiles"
+
+_MASTERFILES_VERSION_RE = re.compile(r"[0-9]+(\.[0-9]+){2}(\-[0-9]+)?")
+_VERSION_SPLIT_RE = re.compile(r"[-\.]")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_version(version: str) -> tuple:
+    """Parse a version string like "3.21.0" or "1.2.3-1" into comparable numbers"""
+    return tuple(int(n) for n in _VERSION_SPLIT_RE.split(version))
+
 
 PLURAL_S = lambda args, _: "s" if len(args[0]) > 1 else ""
 FIRST_ARG = lambda args, _: "'%s'" % args[0]
@@ -132,6 +147,24 @@ def init_command(index=None, masterfiles=None, non_interactive=False) -> int:
     if is_cfbs_repo():
         user_error("Already initialized - look at %s" % cfbs_filename())
 
+    # If --masterfiles is a branch, start looking up its current commit on
+    # the remote (network) now, while the prompts / local setup happen. In a
+    # daemon thread, so that returning early does not wait for the network,
+    # and quietly, so that git errors don't show up between the prompts:
+    masterfiles_lookup = None
+    if (
+        masterfiles is not None
+        and masterfiles != "no"
+        and not _MASTERFILES_VERSION_RE.match(masterfiles)
+    ):
+        masterfiles_lookup = Future()
+        threading.Thread(
+            target=lambda: masterfiles_lookup.set_result(
+                ls_remote(_MASTERFILES_REMOTE, masterfiles, quiet=True)
+            ),
+            daemon=True,
+        ).start()
+
     name = prompt_user(
         non_interactive,
         "Please enter the name of this CFEngine Build project",
@@ -257,7 +290,7 @@ def init_command(index=None, masterfiles=None, non_interactive=False) -> int:
                     default="",
                 )
             ]
-    elif re.match(r"[0-9]+(\.[0-9]+){2}(\-[0-9]+)?", masterfiles):
+    elif _MASTERFILES_VERSION_RE.match(masterfiles):
         log.debug("--masterfiles=%s appears to be a version number" % masterfiles)
         to_add = ["masterfiles@%s" % masterfiles]
     elif masterfiles != "no":
@@ -271,8 +304,8 @@ def init_command(index=None, masterfiles=None, non_interactive=False) -> int:
         to_add = ["masterfiles"]
 
     if branch is not None:
-        remote = "https://github.com/cfengine/masterfiles"
-        commit = ls_remote(remote, branch)
+        remote = _MASTERFILES_REMOTE
+        commit = masterfiles_lookup.result()
         if commit is None:
             user_error(
                 "Failed to find branch or tag %s at remote %s" % (branch, remote)
@@ -302,18 +335,30 @@ def status_command() -> int:
         return 0
     print("\nModules:")
     max_length = config.longest_module_name()
-    counter = 1
-    for m in modules:
+    # Names padded to the longest name, commits to the length of a SHA-1:
+    line_format = ("{:03d} {:<%d} @ {:<40} ({})" % max_length).format
+
+    # Check which modules are downloaded in parallel, each check can take a
+    # while on network file systems:
+    paths = [
+        None if m["name"].startswith("./") else get_download_path(m) for m in modules
+    ]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        downloaded = list(
+            executor.map(lambda path: path is not None and os.path.exists(path), paths)
+        )
+
+    lines = []
+    for counter, m in enumerate(modules, start=1):
         if m["name"].startswith("./"):
             status = "Copied"
-            commit = pad_right("local", 40)
+            commit = "local"
         else:
-            path = get_download_path(m)
-            status = "Downloaded" if os.path.exists(path) else "Not downloaded"
+            status = "Downloaded" if downloaded[counter - 1] else "Not downloaded"
             commit = m["commit"]
-        name = pad_right(m["name"], max_length)
-        print("%03d %s @ %s (%s)" % (counter, name, commit, status))
-        counter += 1
+        lines.append(line_format(counter, m["name"], commit, status))
+    # One write for all modules, instead of one per module:
+    print("\n".join(lines))
 
     return 0
 
@@ -326,28 +371,25 @@ def search_command(terms: list) -> int:
     # in order to gather all aliases, we must iterate over everything first
     for name, data in index.items():
         if "alias" in data:
-            realname = data["alias"]
-            if realname not in results:
-                results[realname] = {}
-            if "aliases" in results[realname]:
-                results[realname]["aliases"].append(name)
-            else:
-                results[realname]["aliases"] = [name]
-            continue
-        if name in results:
-            results[name]["description"] = data["description"]
+            entry = results.setdefault(
+                data["alias"], {"description": None, "aliases": []}
+            )
+            entry["aliases"].append(name)
         else:
-            results[name] = {"description": data["description"], "aliases": []}
+            entry = results.setdefault(name, {"description": None, "aliases": []})
+            entry["description"] = data["description"]
+
+    # Skip aliases pointing to modules which are not in the index:
+    results = {k: v for k, v in results.items() if v["description"] is not None}
 
     filtered = {}
     if terms:
-        for name in (
-            name
-            for name, data in results.items()
-            if any((t for t in terms if t in name))
-            or any((t for t in terms if any((s for s in data["aliases"] if t in s))))
-        ):
-            filtered[name] = results[name]
+        for name, data in results.items():
+            # Search the name and all aliases at once, the separator ensures
+            # a term cannot match across two of them:
+            haystack = "\0".join([name] + data["aliases"])
+            if any(t in haystack for t in terms):
+                filtered[name] = data
     else:
         filtered = results
 
@@ -387,28 +429,19 @@ def remove_command(to_remove: list):
     modules = config["build"]
 
     def _get_dependents(dependency) -> list:
-        if len(modules) < 2:
-            return []
+        return [m["name"] for m in modules if dependency in m.get("dependencies", ())]
 
-        def reduce_dependencies(a, b):
-            result_b = [b["name"]] if dependency in b.get("dependencies", []) else []
-            if type(a) is list:
-                return a + result_b
-            else:
-                return (
-                    [a["name"]] if dependency in a.get("dependencies", []) else []
-                ) + result_b
-
-        return functools.reduce(reduce_dependencies, modules)
+    modules_by_name = {m["name"]: m for m in modules}
 
     def _get_module_by_name(name) -> dict:
         if not name.startswith("./") and name.endswith(".cf") and os.path.exists(name):
             name = "./" + name
 
-        for module in modules:
-            if module["name"] == name:
-                return module
-        return None
+        return modules_by_name.get(name)
+
+    def _remove_module(module):
+        modules.remove(module)
+        modules_by_name.pop(module["name"], None)
 
     def _remove_module_user_prompt(module):
         dependents = _get_dependents(module["name"])
@@ -433,7 +466,7 @@ def remove_command(to_remove: list):
         return r
 
     num_removed = 0
-    msg = ""
+    msg_lines = []
     files = []
     for name in to_remove:
         if name.startswith(("https://", "ssh://", "git://")):
@@ -444,8 +477,8 @@ def remove_command(to_remove: list):
                 answer = _remove_module_user_prompt(module)
                 if answer.lower() in ("yes", "y"):
                     print("Removing module '%s'" % module["name"])
-                    modules.remove(module)
-                    msg += "\n - Removed module '%s'" % module["name"]
+                    _remove_module(module)
+                    msg_lines.append("\n - Removed module '%s'" % module["name"])
                     num_removed += 1
         else:
             module = _get_module_by_name(name)
@@ -453,8 +486,8 @@ def remove_command(to_remove: list):
                 answer = _remove_module_user_prompt(module)
                 if answer.lower() in ("yes", "y"):
                     print("Removing module '%s'" % name)
-                    modules.remove(module)
-                    msg += "\n - Removed module '%s'" % module["name"]
+                    _remove_module(module)
+                    msg_lines.append("\n - Removed module '%s'" % module["name"])
                     num_removed += 1
             else:
                 print("Module '%s' not found" % name)
@@ -468,10 +501,11 @@ def remove_command(to_remove: list):
         ).lower() in ("yes", "y"):
             rm(input_path)
             files.append(input_path)
-            msg += "\n - Removed input data for module '%s'" % name
+            msg_lines.append("\n - Removed input data for module '%s'" % name)
             log.debug("Deleted module data '%s'" % input_path)
 
-    num_lines = len(msg.strip().splitlines())
+    msg = "".join(msg_lines)
+    num_lines = len(msg_lines)
     changes_made = num_lines > 0
     if num_lines > 1:
         msg = "Removed %d modules\n" % num_removed + msg
@@ -504,20 +538,22 @@ def _clean_unused_modules(config=None):
     if len(modules) == 0:
         return 0
 
-    def _someone_needs_me(this) -> bool:
-        if "added_by" not in this or this["added_by"] == "cfbs add":
-            return True
-        for other in modules:
-            if not "dependencies" in other:
-                continue
-            if this["name"] in other["dependencies"]:
-                return _someone_needs_me(other)
-        return False
+    # Modules added by the user are needed, and so is everything they depend
+    # on (directly or indirectly). Walk the dependencies once, starting from
+    # the modules added by the user, visiting each module at most once:
+    dependencies = {m["name"]: m.get("dependencies", []) for m in modules}
+    needed = set()
+    stack = [
+        m["name"] for m in modules if "added_by" not in m or m["added_by"] == "cfbs add"
+    ]
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        stack.extend(dependencies.get(name, []))
 
-    to_remove = list()
-    for module in modules:
-        if not _someone_needs_me(module):
-            to_remove.append(module)
+    to_remove = [m for m in modules if m["name"] not in needed]
 
     if not to_remove:
         raise CFBSReturnWithoutCommit(0)
@@ -662,35 +698,37 @@ def update_command(to_update):
     new_deps = []
     new_deps_added_by = dict()
     changes_made = False
-    msg = ""
+    msg_lines = []
     files = []
     updated = []
 
-    for update in to_update:
-        module = config.get_module_from_build(update.name)
-
-        custom_index = module is not None and "index" in module
-        index = Index(module["index"]) if custom_index else config.index
-
-        if not module:
-            index.translate_alias(update)
-            module = config.get_module_from_build(update.name)
+    # Modules added from the same custom index share one Index object,
+    # so that index is only downloaded / read once:
+    custom_indices = {}
 
-        if not module:
-            log.warning("Module '%s' not in build. Skipping its update." % update.name)
-            continue
+    # Modules are only updated in place (not renamed, added or removed) in
+    # the loop below, so they can be looked up by name in a dictionary:
+    build_by_name = {m["name"]: m for m in build}
 
-        custom_index = module is not None and "index" in module
-        index = Index(module["index"]) if custom_index else config.index
+    for update in to_update:
+        module = build_by_name.get(update.name)
 
         if not module:
-            index.translate_alias(update)
-            module = config.get_module_from_build(update.name)
+            config.index.translate_alias(update)
+            module = build_by_name.get(update.name)
 
         if not module:
             log.warning("Module '%s' not in build. Skipping its update." % update.name)
             continue
 
+        # Choose the index from the module found, after resolving any alias:
+        if "index" in module:
+            if module["index"] not in custom_indices:
+                custom_indices[module["index"]] = Index(module["index"])
+            index = custom_indices[module["index"]]
+        else:
+            index = config.index
+
         if "version" not in module:
             log.warning(
                 "Module '%s' not updatable. Skipping its update." % module["name"]
@@ -707,14 +745,8 @@ def update_command(to_update):
             )
             continue
 
-        local_ver = [
-            int(version_number)
-            for version_number in re.split(r"[-\.]", module["version"])
-        ]
-        index_ver = [
-            int(version_number)
-            for version_number in re.split(r"[-\.]", index_info["version"])
-        ]
+        local_ver = _parse_version(module["version"])
+        index_ver = _parse_version(index_info["version"])
         if local_ver == index_ver:
             print("Module '%s' already up to date" % module["name"])
             continue
@@ -775,7 +807,7 @@ def update_command(to_update):
                                 "no",
                             ).lower() in ("no", "n"):
                                 continue
-                            input_data = copy.deepcopy(module["input"])
+                            input_data = copy_json(module["input"])
                             config.input_command(module["name"], input_data)
                             changes_made = True
 
@@ -804,10 +836,9 @@ def update_command(to_update):
         if not update.version:
             update.version = index_info["version"]
         updated.append(update)
-        msg += "\n - Updated module '%s' from version %s to version %s" % (
-            update.name,
-            old_version,
-            update.version,
+        msg_lines.append(
+            "\n - Updated module '%s' from version %s to version %s"
+            % (update.name, old_version, update.version)
         )
 
     if new_deps:
@@ -815,6 +846,7 @@ def update_command(to_update):
         config.add_with_dependencies(objects)
     config.save()
 
+    msg = "".join(msg_lines)
     if changes_made:
         if len(updated) > 1:
             msg = "Updated %d modules\n" % len(updated) + msg
@@ -834,21 +866,43 @@ def validate_command() -> int:
     return validate_config(config)
 
 
+def _clone_commits(url, commits):
+    """Clone the given commits of the repository at url
+
+    :param commits: list of (commit, commit_dir) tuples
+
+    The repository is only cloned from the remote once, other commits are
+    cloned from that local clone, if they are available in it.
+    """
+    local_clone = None
+    for commit, commit_dir in commits:
+        if local_clone is None or not git_clone_local(
+            local_clone, commit, commit_dir, url
+        ):
+            rm(commit_dir, missing_ok=True)
+            sh("git clone %s %s" % (url, commit_dir))
+            sh("(cd %s && git checkout %s)" % (commit_dir, commit))
+            local_clone = commit_dir
+
+
 def _download_dependencies(
     config, prefer_offline=False, redownload=False, ignore_versions=False
 ):
-    # TODO: This function should be split in 2:
-    #       1. Code for downloading things into ~/.cfengine
-    #       2. Code for copying things into ./out
+    # Done in 3 steps:
+    #   1. Find what needs to be downloaded into ~/.cfengine
+    #   2. Download it, in parallel, since it is mostly waiting for the network
+    #   3. Copy things into ./out, in the order of the build list
     print("\nModules:")
-    counter = 1
     max_length = config.longest_module_name()
-    downloads = os.path.join(cfbs_dir(), "downloads")
-    for module in config.get("build", []):
+    download_format = ("{:03d} {:<%d} @ {} (Downloaded)" % max_length).format
+    modules = config.get("build", [])
+
+    downloads = OrderedDict()  # commit_dir -> function downloading it
+    clones = OrderedDict()  # url -> [(commit, commit_dir), ...]
+    planned = set()  # commit_dirs already looked at
+    for module in modules:
         name = module["name"]
         if name.startswith("./"):
-            local_module_copy(module, counter, max_length)
-            counter += 1
             continue
         if "commit" not in module:
             user_error("module %s must have a commit property" % name)
@@ -859,45 +913,80 @@ def _download_dependencies(
         url = module.get("url") or module["repo"]
         url = strip_right(url, ".git")
         commit_dir = get_download_path(module)
+        if commit_dir in planned:
+            continue  # Another module from the same commit, already handled
+        planned.add(commit_dir)
         if redownload:
             rm(commit_dir, missing_ok=True)
         if "subdirectory" in module:
             module_dir = os.path.join(commit_dir, module["subdirectory"])
         else:
             module_dir = commit_dir
-        if not os.path.exists(module_dir):
-            if url.endswith(SUPPORTED_ARCHIVES):
-                if os.path.exists(commit_dir) and "subdirectory" in module:
-                    user_error(
-                        "Subdirectory '%s' for module '%s' was not found in fetched archive '%s': "
-                        % (module["subdirectory"], name, url)
-                        + "Please check cfbs.json for possible typos."
-                    )
-                fetch_archive(url, commit)
-            # a couple of cases where there will not be an archive available:
-            # - using an alternate index (index property in module data)
-            # - added by URL instead of name (no version property in module data)
-            elif "index" in module or "url" in module or ignore_versions:
-                if os.path.exists(commit_dir) and "subdirectory" in module:
-                    user_error(
-                        "Subdirectory '%s' for module '%s' was not found in cloned repository '%s': "
-                        % (module["subdirectory"], name, url)
-                        + "Please check cfbs.json for possible typos."
-                    )
-                sh("git clone %s %s" % (url, commit_dir))
-                sh("(cd %s && git checkout %s)" % (commit_dir, commit))
-            else:
-                versions = get_json(_VERSION_INDEX)
-                try:
-                    checksum = versions[name][module["version"]]["archive_sha256"]
-                except KeyError:
-                    user_error("Cannot verify checksum of the '%s' module" % name)
-                module_archive_url = os.path.join(
-                    _MODULES_URL, name, commit + ".tar.gz"
+        if os.path.exists(module_dir):
+            continue
+        if url.endswith(SUPPORTED_ARCHIVES):
+            if os.path.exists(commit_dir) and "subdirectory" in module:
+                user_error(
+                    "Subdirectory '%s' for module '%s' was not found in fetched archive '%s': "
+                    % (module["subdirectory"], name, url)
+                    + "Please check cfbs.json for possible typos."
                 )
-                fetch_archive(
-                    module_archive_url, checksum, directory=commit_dir, with_index=False
+            downloads[commit_dir] = functools.partial(fetch_archive, url, commit)
+        # a couple of cases where there will not be an archive available:
+        # - using an alternate index (index property in module data)
+        # - added by URL instead of name (no version property in module data)
+        elif "index" in module or "url" in module or ignore_versions:
+            if os.path.exists(commit_dir) and "subdirectory" in module:
+                user_error(
+                    "Subdirectory '%s' for module '%s' was not found in cloned repository '%s': "
+                    % (module["subdirectory"], name, url)
+                    + "Please check cfbs.json for possible typos."
                 )
+            clones.setdefault(url, []).append((commit, commit_dir))
+        else:
+            versions = get_version_index()
+            try:
+                checksum = versions[name][module["version"]]["archive_sha256"]
+            except KeyError:
+                user_error("Cannot verify checksum of the '%s' module" % name)
+            module_archive_url = os.path.join(_MODULES_URL, name, commit + ".tar.gz")
+            downloads[commit_dir] = functools.partial(
+                fetch_archive,
+                module_archive_url,
+                checksum,
+                directory=commit_dir,
+                with_index=False,
+            )
+
+    # Commits of the same repository are cloned one after another, so they
+    # can reuse the first clone, see _clone_commits():
+    tasks = list(downloads.values()) + [
+        functools.partial(_clone_commits, url, commits)
+        for url, commits in clones.items()
+    ]
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            try:
+                for future in futures:
+                    # Re-raises errors from the download, including user_error():
+                    future.result()
+            except BaseException:
+                # Don't start the remaining downloads, only wait for the ones
+                # already running:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    counter = 1
+    for module in modules:
+        name = module["name"]
+        if name.startswith("./"):
+            local_module_copy(module, counter, max_length)
+            counter += 1
+            continue
+        commit = module["commit"]
+        commit_dir = get_download_path(module)
         target = "out/steps/%03d_%s_%s/" % (counter, module["name"], commit)
         module["_directory"] = target
         module["_counter"] = counter
@@ -905,10 +994,14 @@ def _download_dependencies(
         if not subdirectory:
             cp(commit_dir, target)
         else:
+            if not os.path.exists(os.path.join(commit_dir, subdirectory)):
+                user_error(
+                    "Subdirectory '%s' for module '%s' was not found in '%s': "
+                    % (subdirectory, name, module.get("url") or module["repo"])
+                    + "Please check cfbs.json for possible typos."
+                )
             cp(os.path.join(commit_dir, subdirectory), target)
-        print(
-            "%03d %s @ %s (Downloaded)" % (counter, pad_right(name, max_length), commit)
-        )
+        print(download_format(counter, name, commit))
         counter += 1
 
 
@@ -962,7 +1055,7 @@ def install_command(args) -> int:
     if not destination.startswith("/") and not destination.startswith("./"):
         destination = "./" + destination
     rm(destination, missing_ok=True)
-    cp("out/masterfiles", destination)
+    cp_tree("out/masterfiles", destination)
     print("Installed to %s" % destination)
     return 0
 
@@ -972,8 +1065,10 @@ def help_command():
     raise ProgrammerError("help_command should not be called, as we use argparse")
 
 
-def _print_module_info(data):
-    ordered_keys = [
+# Keys shown by cfbs info, in order, and the label to show for each of them:
+_MODULE_INFO_LABELS = [
+    (key, key.title().replace("_", " "))
+    for key in (
         "module",
         "version",
         "status",
@@ -986,14 +1081,21 @@ def _print_module_info(data):
         "dependencies",
         "added_by",
         "description",
-    ]
-    for key in ordered_keys:
+    )
+]
+
+
+def _print_module_info(data):
+    lines = []
+    for key, label in _MODULE_INFO_LABELS:
         if key in data:
-            if key in ["tags", "dependencies"]:
+            if key in ("tags", "dependencies"):
                 value = ", ".join(data[key])
             else:
                 value = data[key]
-            print("{}: {}".format(key.title().replace("_", " "), value))
+            lines.append("{}: {}".format(label, value))
+    if lines:
+        print("\n".join(lines))
 
 
 @cfbs_command("show")
@@ -1005,41 +1107,60 @@ def info_command(modules):
     config.warn_about_unknown_keys()
     index = config.index
 
-    build = config.get("build", {})
-
-    alias = None
+    build_by_name = {m["name"]: m for m in config.get("build", [])}
 
     for module in modules:
         print()  # whitespace for readability
-        in_build = any(m for m in build if m["name"] == module)
-        if not index.exists(module) and not in_build:
-            print("Module '{}' does not exist".format(module))
-            continue
-        if in_build:
+        alias = None
+        if module in build_by_name:
             # prefer information from the local source
-            data = next(m for m in build if m["name"] == module)
-            data["status"] = "Added"
+            data = build_by_name[module]
+            status = "Added"
         elif module in index:
             data = index[module]
             if "alias" in data:
                 alias = module
                 module = data["alias"]
                 data = index[module]
-            data["status"] = "Added" if in_build else "Not added"
+            status = "Not added"
         else:
-            if not module.startswith("./"):
-                module = "./" + module
-            data = next((m for m in build if m["name"] == module), None)
+            local_name = module if module.startswith("./") else "./" + module
+            data = build_by_name.get(local_name)
             if data is None:
-                print("Path {} exists but is not yet added as a module.".format(module))
+                if os.path.exists(module):
+                    print(
+                        "Path {} exists but is not yet added as a module.".format(
+                            local_name
+                        )
+                    )
+                else:
+                    print("Module '{}' does not exist".format(module))
                 continue
-            data["status"] = "Added"
-        data["module"] = (module + "({})".format(alias)) if alias else module
-        _print_module_info(data)
+            module = local_name
+            status = "Added"
+        # Add the extra fields to a copy, not to the config / index data:
+        view = dict(
+            data,
+            status=status,
+            module=(module + "({})".format(alias)) if alias else module,
+        )
+        _print_module_info(view)
     print()  # extra line for ease of reading
     return 0
 
 
+def _input_unchanged(path, input_data):
+    """Check whether the input.json at path already contains input_data
+
+    Unlike read_json(), does not exit on invalid JSON, a missing or corrupt
+    input.json is simply considered changed, so that it can be overwritten.
+    """
+    try:
+        return parse_json(read_file(path), ordered_dict=False) == input_data
+    except (TypeError, ValueError):
+        return False
+
+
 @cfbs_command("input")
 @commit_after_command("Added input for module%s", [PLURAL_S])
 def input_command(args, input_from="cfbs input"):
@@ -1047,8 +1168,9 @@ def input_command(args, input_from="cfbs input"):
     config.warn_about_unknown_keys()
     do_commit = False
     files_to_commit = []
+    build_by_name = {m["name"]: m for m in config.get("build", [])}
     for module_name in args:
-        module = config.get_module_from_build(module_name)
+        module = build_by_name.get(module_name)
         if not module:
             print("Skipping module '%s', module not found" % module_name)
             continue
@@ -1057,7 +1179,8 @@ def input_command(args, input_from="cfbs input"):
             continue
 
         input_path = os.path.join(".", module_name, "input.json")
-        if os.path.isfile(input_path):
+        input_exists = os.path.isfile(input_path)
+        if input_exists:
             if prompt_user(
                 config.non_interactive,
                 "Input already exists for this module, do you want to overwrite it?",
@@ -1066,9 +1189,12 @@ def input_command(args, input_from="cfbs input"):
             ).lower() in ("no", "n"):
                 continue
 
-        input_data = copy.deepcopy(module["input"])
+        input_data = copy_json(module["input"])
         config.input_command(module_name, input_data)
 
+        if input_exists and _input_unchanged(input_path, input_data):
+            print("Input for module '%s' unchanged, nothing to write" % module_name)
+            continue
         write_json(input_path, input_data)
         do_commit = True
         files_to_commit.append(input_path)
@@ -1090,62 +1216,43 @@ def set_input_command(name, infile):
     if spec is None:
         log.error("Module '%s' does not accept input" % name)
         return 1
-    log.debug("Input spec for module '%s': %s" % (name, pretty(spec)))
+    log.debug("Input spec for module '%s': %s", name, LazyPretty(spec))
 
     try:
-        data = json.load(infile, object_pairs_hook=OrderedDict)
+        data = parse_json(infile.read(), ordered_dict=False)
     except json.decoder.JSONDecodeError as e:
         log.error("Error reading json from stdin: %s" % e)
         return 1
-    log.debug("Input data for module '%s': %s" % (name, pretty(data)))
-
-    def _compare_dict(a, b, ignore=None):
-        assert isinstance(a, dict) and isinstance(b, dict)
-        ignore = ignore or set()
-        if set(a.keys()) != set(b.keys()) - ignore:
-            return False
-        # Avoid code duplication by converting the values of the two dicts
-        # into two lists in the same order and compare the lists instead
-        keys = a.keys()
-        return _compare_list([a[key] for key in keys], [b[key] for key in keys])
-
-    def _compare_list(a, b):
-        assert isinstance(a, list) and isinstance(b, list)
-        if len(a) != len(b):
-            return False
-        for x, y in zip(a, b):
-            if type(x) != type(y):
-                return False
-            if isinstance(x, dict):
-                if not _compare_dict(x, y):
-                    return False
-            elif isinstance(x, list):
-                if not _compare_list(x, y):
-                    return False
-            else:
-                assert isinstance(
-                    x, (int, float, str, bool, None)
-                ), "Illegal value type"
-                if x != y:
-                    return False
-        return True
-
-    for a, b in zip(spec, data):
-        if (
-            not isinstance(a, dict)
-            or not isinstance(b, dict)
-            or not _compare_dict(a, b, ignore=set({"response"}))
-        ):
-            log.error(
-                "Input data for module '%s' does not conform with input definition"
-                % name
-            )
-            return 1
+    log.debug("Input data for module '%s': %s", name, LazyPretty(data))
+
+    def _canonical(d, ignore=()):
+        # Key order does not matter, but types do (e.g. 1 is not 1.0 or true):
+        return json.dumps(
+            {k: v for k, v in d.items() if k not in ignore}, sort_keys=True
+        )
+
+    # One entry of data for each input definition in the spec, and apart from
+    # the response, the entries must match the definitions exactly:
+    conforms = (
+        isinstance(data, list)
+        and len(data) == len(spec)
+        and all(
+            isinstance(a, dict)
+            and isinstance(b, dict)
+            and _canonical(a) == _canonical(b, ignore=("response",))
+            for a, b in zip(spec, data)
+        )
+    )
+    if not conforms:
+        log.error(
+            "Input data for module '%s' does not conform with input definition" % name
+        )
+        return 1
 
     path = os.path.join(name, "input.json")
 
     log.debug("Comparing with data already in file '%s'" % path)
-    old_data = read_json(path)
+    old_data = read_json(path, ordered_dict=False)
     changes_made = old_data != data
 
     if changes_made:
@@ -1174,7 +1281,7 @@ def get_input_command(name, outfile):
         data = []
     else:
         path = os.path.join(name, "input.json")
-        data = read_json(path)
+        data = read_json(path, ordered_dict=False)
         if data is None:
             log.debug("Loaded input from module '%s' definition" % name)
             data = module["input"]
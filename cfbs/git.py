@@ -17,16 +17,20 @@ class CFBSGitError(Exception):
     pass
 
 
-def ls_remote(remote, branch):
+def ls_remote(remote, branch, quiet=False):
     """Returns the hash of the commit that the current HEAD of a given branch
     on a given remote is pointing to.
 
     :param remote: the remote to list
     :param branch: the branch on the remote
+    :param quiet: suppress error messages from git
     """
     try:
         return (
-            check_output(["git", "ls-remote", remote, branch])
+            check_output(
+                ["git", "ls-remote", remote, branch],
+                stderr=DEVNULL if quiet else None,
+            )
             .decode()
             .strip()
             .split()[0]
@@ -35,6 +39,40 @@ def ls_remote(remote, branch):
         return None
 
 
+def git_clone_local(repo_path, commit, target, url=None):
+    """Clone an existing local clone into a directory and check out a commit
+
+    Only reads from the local clone (objects are hardlinked where possible),
+    so unlike cloning the remote again, this does not need the network. The
+    result is the same as cloning the remote and checking out the commit.
+
+    :param repo_path: path to the (non-bare) local clone
+    :param commit: commit to check out
+    :param target: directory to clone into
+    :param url: URL of the original remote, used as the origin of the new clone
+    :return: `True` if successful, `False` otherwise (e.g. the commit is not
+             available in the local clone)
+    """
+    git_dir = os.path.join(repo_path, ".git")
+    if not os.path.isdir(git_dir):
+        return False
+    try:
+        check_call(
+            ["git", "--git-dir", git_dir, "cat-file", "-e", commit + "^{commit}"],
+            stderr=DEVNULL,
+        )
+        check_call(
+            ["git", "clone", "--quiet", "--no-checkout", repo_path, target],
+            stderr=DEVNULL,
+        )
+        check_call(["git", "-C", target, "checkout", "--quiet", commit], stderr=DEVNULL)
+        if url is not None:
+            check_call(["git", "-C", target, "remote", "set-url", "origin", url])
+    except CalledProcessError:
+        return False
+    return True
+
+
 def is_git_repo(path=None):
     """Is the given path a Git repository?)
 
@@ -2,7 +2,7 @@ import sys, os
 from collections import OrderedDict
 
 from cfbs.module import Module
-from cfbs.utils import get_or_read_json, user_error, get_json
+from cfbs.utils import get_or_read_json, user_error, get_json, cache
 from cfbs.internal_file_management import local_module_name
 
 _DEFAULT_INDEX = (
@@ -13,6 +13,12 @@ _VERSION_INDEX = (
 )
 
 
+@cache
+def get_version_index():
+    """Download versions.json, only once per run of cfbs"""
+    return get_json(_VERSION_INDEX)
+
+
 def _local_module_data_cf_file(module):
     dst = os.path.join("services", "cfbs", module[2:])
     return {
@@ -121,7 +127,7 @@ class Index:
             return True
         if not version:
             return name in self
-        versions = get_json(_VERSION_INDEX)
+        versions = get_version_index()
         return name in versions and version in versions[name]
 
     def check_existence(self, modules: list):
@@ -162,7 +168,7 @@ class Index:
         else:
             object = self[name]
             if version:
-                versions = get_json(_VERSION_INDEX)
+                versions = get_version_index()
                 new_values = versions[name][version]
                 specifics = {
                     k: v for (k, v) in new_values.items() if k in Module.attributes()
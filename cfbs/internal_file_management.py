@@ -213,6 +213,12 @@ def fetch_archive(url, checksum=None, directory=None, with_index=True):
     mkdir(archive_dir)
 
     archive_path = os.path.join(downloads, archive_dir, archive_filename)
+    if with_index and checksum is not None:
+        # The content is stored by checksum, so if we already have it there is
+        # no need to download the archive again:
+        index_path = os.path.join(downloads, archive_dir, checksum, "cfbs.json")
+        if os.path.exists(index_path):
+            return (index_path, checksum)
     try:
         archive_checksum = fetch_url(url, archive_path, checksum)
     except FetchError as e:
@@ -304,3 +304,18 @@ def pretty(o, sorting_rules=None):
             raise ValueError("Illegal value type '" + type(data).__name__ + "'")
 
     return _encode(o, 0, 0)
+
+
+class LazyPretty:
+    """Pretty printed JSON which is only generated when converted to a string
+
+    Meant for log messages, e.g. log.debug("Data: %s", LazyPretty(data)) does
+    not pretty print the data unless debug logging is enabled.
+    """
+
+    def __init__(self, o, sorting_rules=None):
+        self.o = o
+        self.sorting_rules = sorting_rules
+
+    def __str__(self):
+        return pretty(self.o, self.sorting_rules)
@@ -3,16 +3,21 @@ import re
 import sys
 import json
 import copy
+import gzip
 import subprocess
 import hashlib
 import logging as log
-import urllib
-import urllib.request  # needed on some platforms
 from collections import OrderedDict
-from shutil import rmtree
+from shutil import copymode, rmtree
 
 from cfbs.pretty import pretty
 
+try:
+    # Optional, much faster JSON parser, only used for read-only data:
+    import orjson
+except ImportError:
+    orjson = None
+
 SHA1_RE = re.compile(r"^[0-9a-f]{40}$")
 SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
 
@@ -78,6 +83,26 @@ def cp(src, dst):
     sh("rsync -r %s/ %s" % (src, dst))
 
 
+def cp_tree(src, dst):
+    """Copy the contents of the directory src into dst
+
+    Uses copy-on-write clones (reflinks) of the files where the filesystem
+    supports it (e.g. Btrfs, XFS), which only copies metadata. Falls back to
+    a regular copy otherwise, and to cp() where GNU cp is not available.
+    """
+    above = os.path.dirname(dst)
+    if above and not os.path.exists(above):
+        mkdir(above)
+    try:
+        subprocess.run(
+            ["cp", "-R", "--reflink=auto", os.path.join(src, "."), dst],
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        cp(src, dst)
+
+
 def pad_left(s, n) -> int:
     return s if len(s) >= n else " " * (n - len(s)) + s
 
@@ -90,10 +115,45 @@ def user_error(msg: str):
     sys.exit("Error: " + msg)
 
 
+def parse_json(data, ordered_dict=True):
+    """Parse JSON from a str or bytes object
+
+    Objects are parsed into OrderedDict by default, which is what the sorting
+    in pretty() requires. Data which is never sorted can use
+    `ordered_dict=False` to get plain (insertion ordered) dicts, parsed by the
+    much faster orjson, if it is available.
+    """
+    if not ordered_dict and orjson is not None:
+        return orjson.loads(data)
+    if type(data) is bytes:
+        data = data.decode()
+    return json.loads(data, object_pairs_hook=OrderedDict)
+
+
+def copy_json(data):
+    """Deep copy of JSON data (dicts, lists, strings, numbers, booleans, None)
+
+    Serializing and parsing in C is much faster than copy.deepcopy(), which
+    dispatches on the type of every object in Python.
+    """
+    if orjson is not None:
+        return orjson.loads(orjson.dumps(data))
+    return json.loads(json.dumps(data), object_pairs_hook=OrderedDict)
+
+
 def get_json(url: str) -> OrderedDict:
-    with urllib.request.urlopen(url) as r:
+    import urllib.request  # Slow to import, only when needed
+
+    # JSON compresses well, so ask for it compressed:
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request) as r:
         assert r.status >= 200 and r.status < 300
-        return json.loads(r.read().decode(), object_pairs_hook=OrderedDict)
+        data = r.read()
+        if r.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+    # Downloaded JSON (index, versions) is not written back, so plain dicts
+    # are fine, no need for OrderedDict
+    return parse_json(data, ordered_dict=False)
 
 
 def get_or_read_json(path: str) -> OrderedDict:
@@ -135,14 +195,14 @@ def read_file(path):
 def save_file(path, data):
     if "/" in path:
         mkdir("/".join(path.split("/")[0:-1]))
-    with open(path, "w") as f:
+    with open(path, "wb" if type(data) is bytes else "w") as f:
         f.write(data)
 
 
-def read_json(path):
+def read_json(path, ordered_dict=True):
     try:
-        with open(path, "r") as f:
-            return json.loads(f.read(), object_pairs_hook=OrderedDict)
+        with open(path, "rb") as f:
+            return parse_json(f.read(), ordered_dict)
     except FileNotFoundError:
         return None
     except NotADirectoryError:
@@ -153,8 +213,20 @@ def read_json(path):
 
 
 def write_json(path, data):
-    data = pretty(data) + "\n"
-    return save_file(path, data)
+    data = (pretty(data) + "\n").encode("utf-8")
+    # Write through symlinks, replacing the file they point to:
+    path = os.path.realpath(path)
+    # Write to a temporary file and rename it, so that path is never left
+    # with partially written JSON:
+    tmp = path + ".tmp"
+    try:
+        save_file(tmp, data)
+        if os.path.exists(path):
+            copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        rm(tmp, missing_ok=True)
+        raise
 
 
 def merge_json(a, b, overwrite_callback=None, stack=None):
@@ -206,6 +278,8 @@ class FetchError(Exception):
 
 
 def fetch_url(url, target, checksum=None):
+    import urllib.request  # Slow to import, only when needed
+
     if checksum is not None:
         if SHA1_RE.match(checksum):
             sha = hashlib.sha1()
@@ -228,14 +302,16 @@ def fetch_url(url, target, checksum=None):
             with urllib.request.urlopen(request) as u:
                 if not (200 <= u.status <= 300):
                     raise FetchError("Failed to fetch '%s': %s" % (url, u.reason))
-                done = False
-                while not done:
-                    chunk = u.read(512 * 1024)  # 512 KiB
-                    if len(chunk) == 0:
-                        done = True
-                    else:
-                        f.write(chunk)
-                        sha.update(chunk)
+                # Read into the same buffer each time, instead of allocating
+                # a new bytes object for every chunk:
+                buf = memoryview(bytearray(512 * 1024))  # 512 KiB
+                while True:
+                    n = u.readinto(buf)
+                    if not n:
+                        break
+                    chunk = buf[:n]
+                    f.write(chunk)
+                    sha.update(chunk)
         digest = sha.digest().hex()
         if checksum is not None:
             if checksum == digest:
@@ -298,12 +374,6 @@ def canonify(s: str):
     return s
 
 
-def load_bundlenames(file: str):
-    with open(file, "r") as f:
-        policy = f.read()
-    return loads_bundlenames(policy)
-
-
 def loads_bundlenames(policy: str):
     # The lookbehind only supports fixed length strings
     policy = re.sub(r"[ \t]+", " ", policy)
@@ -29,10 +29,7 @@ class CFBSValidationError(Exception):
 
 
 def _validate_top_level_keys(config):
-    # Convert the CFBSJson object to a simple dictionary with exactly
-    # what was in the file. We don't want CFBSJson / CFBSConfig to do any
-    # translations here:
-    config = config.raw_data
+    # config is the simple dictionary from raw_data (see _validate_config)
 
     # Check that required fields are there:
 
@@ -104,8 +101,11 @@ def _validate_top_level_keys(config):
 def _validate_config(config, empty_build_list_ok=False):
     # First validate the config i.e. the user's cfbs.json
     config.warn_about_unknown_keys()
-    _validate_top_level_keys(config)
+    # Convert the CFBSJson object to a simple dictionary with exactly
+    # what was in the file. We don't want CFBSJson / CFBSConfig to do any
+    # translations here:
     raw_data = config.raw_data
+    _validate_top_level_keys(raw_data)
 
     if config["type"] == "policy-set" or "build" in config:
         _validate_config_for_build_field(config, empty_build_list_ok)
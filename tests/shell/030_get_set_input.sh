@@ -107,6 +107,39 @@ echo '[
 ]' > igors-input.json
 ! cfbs set-input create-single-file igors-input.json
 
+# Igor leaves out the input entry
+echo '[]' > igors-input.json
+! cfbs set-input create-single-file igors-input.json
+
+# Igor adds an extra input entry
+echo '[
+  {
+    "type": "string",
+    "variable": "filename",
+    "label": "Filename",
+    "question": "What file should this module create?",
+    "response": "/tmp/test-2.txt"
+  },
+  {
+    "type": "string",
+    "variable": "filename",
+    "label": "Filename",
+    "question": "What file should this module create?",
+    "response": "/tmp/test-3.txt"
+  }
+]' > igors-input.json
+! cfbs set-input create-single-file igors-input.json
+
+# Igor sends an object instead of a list
+echo '{
+  "type": "string",
+  "variable": "filename",
+  "label": "Filename",
+  "question": "What file should this module create?",
+  "response": "/tmp/test-2.txt"
+}' > igors-input.json
+! cfbs set-input create-single-file igors-input.json
+
 # Igor changes the order but that's all right
 echo '[
   {
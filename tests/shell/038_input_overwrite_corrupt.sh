@@ -0,0 +1,41 @@
+set -e
+set -x
+cd tests/
+mkdir -p ./tmp/
+cd ./tmp/
+touch cfbs.json && rm cfbs.json
+rm -rf .git
+rm -rf create-single-file
+
+echo '{
+  "build": [
+    {
+      "name": "create-single-file",
+      "input": [
+        {
+          "type": "string",
+          "variable": "filename",
+          "label": "Filename",
+          "question": "What file should this module create?"
+        }
+      ]
+    }
+  ]
+}' > cfbs.json
+
+# A corrupt input.json can be overwritten with new input
+mkdir -p create-single-file
+echo '{broken' > create-single-file/input.json
+printf 'yes\n/tmp/test.txt\n' | cfbs input create-single-file
+
+cfbs get-input create-single-file actual.output
+echo '[
+  {
+    "type": "string",
+    "variable": "filename",
+    "label": "Filename",
+    "question": "What file should this module create?",
+    "response": "/tmp/test.txt"
+  }
+]' > expected.output
+diff actual.output expected.output
@@ -0,0 +1,29 @@
+import json
+
+from cfbs.cfbs_config import CFBSConfig
+from cfbs.commands import _clean_unused_modules
+
+
+def test_clean_unused_modules(tmp_path):
+    path = tmp_path / "cfbs.json"
+    build = [
+        # Added by the user, depends on b, which depends on c:
+        {"name": "a", "dependencies": ["b"]},
+        {"name": "b", "added_by": "a", "dependencies": ["c"]},
+        {"name": "c", "added_by": "b"},
+        # Added with cfbs add, depends on c as well:
+        {"name": "d", "added_by": "cfbs add", "dependencies": ["c"]},
+        # The module which added e is gone, so e and its dependency f are not
+        # needed anymore:
+        {"name": "e", "added_by": "removed", "dependencies": ["f"]},
+        {"name": "f", "added_by": "e"},
+        # Depending on each other does not make g and h needed:
+        {"name": "g", "added_by": "h", "dependencies": ["h"]},
+        {"name": "h", "added_by": "g", "dependencies": ["g"]},
+    ]
+    path.write_text(json.dumps({"name": "Example", "build": build}))
+    config = CFBSConfig(filename=str(path), non_interactive=True)
+
+    assert _clean_unused_modules(config) == 0
+    names = [m["name"] for m in json.loads(path.read_text())["build"]]
+    assert names == ["a", "b", "c", "d"]
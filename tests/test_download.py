@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+import cfbs.commands
+from cfbs.cfbs_config import CFBSConfig
+from cfbs.commands import _download_dependencies
+from cfbs.internal_file_management import get_download_path
+
+COMMIT = "85f9aec38783b5a4dac4777ffa9d17fde5054d14"
+URL = "https://example.com/modules"
+
+
+def _config(tmp_path, build):
+    path = tmp_path / "cfbs.json"
+    path.write_text(json.dumps({"name": "Example", "build": build}))
+    return CFBSConfig(filename=str(path), non_interactive=True)
+
+
+def _module(name, subdirectory):
+    return {
+        "name": name,
+        "url": URL,
+        "commit": COMMIT,
+        "subdirectory": subdirectory,
+        "steps": ["copy policy.cf services/cfbs/"],
+    }
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """Download into tmp_path instead of ~/.cfengine, and record clones / copies"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    calls = {"clone": [], "cp": []}
+
+    def clone_commits(url, commits):
+        calls["clone"].append((url, commits))
+        for _, commit_dir in commits:
+            for subdirectory in ("a", "b"):
+                os.makedirs(os.path.join(commit_dir, subdirectory))
+
+    monkeypatch.setattr(cfbs.commands, "_clone_commits", clone_commits)
+    monkeypatch.setattr(
+        cfbs.commands, "cp", lambda src, dst: calls["cp"].append((src, dst))
+    )
+    return calls
+
+
+def test_download_shared_commit_dir(tmp_path, downloads):
+    config = _config(tmp_path, [_module("a", "a"), _module("b", "b")])
+    _download_dependencies(config)
+
+    # Both modules are in the same commit, which is only cloned once:
+    commit_dir = get_download_path(_module("a", "a"))
+    assert downloads["clone"] == [(URL, [(COMMIT, commit_dir)])]
+    assert downloads["cp"] == [
+        (os.path.join(commit_dir, "a"), "out/steps/001_a_%s/" % COMMIT),
+        (os.path.join(commit_dir, "b"), "out/steps/002_b_%s/" % COMMIT),
+    ]
+
+
+def test_download_missing_subdirectory(tmp_path, downloads):
+    # The subdirectory of the second module is only checked when copying,
+    # since the commit was already planned for the first module:
+    config = _config(tmp_path, [_module("a", "a"), _module("c", "c")])
+    with pytest.raises(SystemExit) as e:
+        _download_dependencies(config)
+    assert "Subdirectory 'c' for module 'c' was not found" in str(e.value)
+    assert len(downloads["clone"]) == 1
+
+
+def test_download_error_in_worker(tmp_path, monkeypatch, downloads):
+    def clone_commits(url, commits):
+        cfbs.commands.user_error("Failed to clone '%s'" % url)
+
+    monkeypatch.setattr(cfbs.commands, "_clone_commits", clone_commits)
+    config = _config(tmp_path, [_module("a", "a")])
+    with pytest.raises(SystemExit) as e:
+        _download_dependencies(config)
+    assert str(e.value) == "Error: Failed to clone '%s'" % URL
+    assert downloads["cp"] == []
@@ -1,4 +1,9 @@
-from cfbs.git import ls_remote
+import os
+from subprocess import check_output
+
+import cfbs.commands
+from cfbs import utils
+from cfbs.git import ls_remote, git_clone_local
 from cfbs.utils import is_a_commit_hash
 
 
@@ -7,3 +12,75 @@ def test_ls_remote():
     print(commit)
     assert commit != None
     assert is_a_commit_hash(commit)
+
+
+def _git(*args, cwd=None):
+    return (
+        check_output(
+            ["git", "-c", "user.name=cfbs", "-c", "user.email=cfbs@example.com"]
+            + list(args),
+            cwd=cwd,
+        )
+        .decode()
+        .strip()
+    )
+
+
+def _repo_with_two_commits(path):
+    os.makedirs(path)
+    _git("init", "-q", cwd=path)
+    commits = []
+    for name in ("first", "second"):
+        with open(os.path.join(path, name), "w") as f:
+            f.write(name + "\n")
+        _git("add", name, cwd=path)
+        _git("commit", "-q", "-m", name, cwd=path)
+        commits.append(_git("rev-parse", "HEAD", cwd=path))
+    return commits
+
+
+def test_git_clone_local(tmp_path):
+    remote = str(tmp_path / "remote")
+    first, second = _repo_with_two_commits(remote)
+    local_clone = str(tmp_path / "first")
+    _git("clone", "-q", remote, local_clone)
+    _git("checkout", "-q", first, cwd=local_clone)
+
+    target = str(tmp_path / "second")
+    assert git_clone_local(local_clone, second, target, "https://example.com/repo")
+    assert _git("rev-parse", "HEAD", cwd=target) == second
+    assert os.path.isfile(os.path.join(target, "second"))
+    assert _git("remote", "get-url", "origin", cwd=target) == (
+        "https://example.com/repo"
+    )
+
+    # The commit is not in the local clone:
+    missing = str(tmp_path / "missing")
+    assert not git_clone_local(local_clone, "0" * 40, missing)
+    assert not os.path.exists(missing)
+    # Not a local clone at all:
+    assert not git_clone_local(str(tmp_path / "nothing"), second, missing)
+
+
+def test_clone_commits(tmp_path, monkeypatch):
+    remote = str(tmp_path / "remote")
+    first, second = _repo_with_two_commits(remote)
+
+    # Record what is run in a shell, i.e. cloning from the remote:
+    commands = []
+
+    def sh(cmd, directory=None):
+        commands.append(cmd)
+        utils.sh(cmd, directory)
+
+    monkeypatch.setattr(cfbs.commands, "sh", sh)
+    first_dir = str(tmp_path / first)
+    second_dir = str(tmp_path / second)
+    cfbs.commands._clone_commits(remote, [(first, first_dir), (second, second_dir)])
+
+    # Only the first commit is cloned from the remote, the second commit is
+    # checked out from that clone:
+    assert len([c for c in commands if c.startswith("git clone")]) == 1
+    assert _git("rev-parse", "HEAD", cwd=first_dir) == first
+    assert _git("rev-parse", "HEAD", cwd=second_dir) == second
+    assert _git("remote", "get-url", "origin", cwd=second_dir) == remote
@@ -0,0 +1,32 @@
+import json
+
+from cfbs.cfbs_config import CFBSConfig
+from cfbs.commands import info_command
+
+INDEX = {
+    "alias-a": {"alias": "module-a"},
+    "module-a": {"description": "Module A", "version": "1.0.0"},
+    "module-b": {"description": "Module B", "version": "2.0.0"},
+}
+BUILD = [{"name": "module-c", "description": "Module C", "added_by": "cfbs add"}]
+
+
+def test_info_command(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "cfbs.json"
+    path.write_text(json.dumps({"name": "Example", "build": BUILD}))
+    index = json.loads(json.dumps(INDEX))
+    config = CFBSConfig(filename=str(path), index=index, non_interactive=True)
+    monkeypatch.setattr(CFBSConfig, "instance", config)
+
+    assert info_command(["alias-a", "module-b", "module-c"]) == 0
+    out = capsys.readouterr().out
+    assert "Module: module-a(alias-a)\n" in out
+    # The alias is only shown for the module it was given for:
+    assert "Module: module-b\n" in out
+    assert "Module: module-c\n" in out
+    assert "Status: Not added\n" in out
+    assert "Status: Added\n" in out
+
+    # The extra fields are not added to the index or config data:
+    assert index == INDEX
+    assert config["build"] == BUILD
@@ -1,5 +1,10 @@
 from collections import OrderedDict
-from cfbs.pretty import pretty, pretty_check_string, pretty_string
+from cfbs.pretty import (
+    LazyPretty,
+    pretty,
+    pretty_check_string,
+    pretty_string,
+)
 from cfbs.utils import item_index
 
 
@@ -220,6 +225,14 @@ def test_pretty_check_string():
     assert pretty_check_string('{ "name": "lars", "age": 27 }') == False
 
 
+def test_lazy_pretty():
+    test = OrderedDict([("name", "lars"), ("friends", ["bob", "alice"])])
+    lazy = LazyPretty(test)
+    test["friends"].append("carol")  # Not pretty printed until used
+    assert str(lazy) == pretty(test)
+    assert "%s" % lazy == pretty(test)
+
+
 def test_pretty_sorting_simple_top_level():
     """Show that simple ways of sorting top level keys work"""
 
@@ -0,0 +1,25 @@
+import json
+
+from cfbs.cfbs_config import CFBSConfig
+from cfbs.commands import search_command
+
+INDEX = {
+    "module-a": {"description": "Module A"},
+    "alias-a": {"alias": "module-a"},
+    # Points to a module which is not in the index:
+    "dangling-alias": {"alias": "missing-module"},
+}
+
+
+def test_search_dangling_alias(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "cfbs.json"
+    path.write_text(json.dumps({"name": "Example", "build": []}))
+    config = CFBSConfig(filename=str(path), index=INDEX, non_interactive=True)
+    monkeypatch.setattr(CFBSConfig, "instance", config)
+
+    assert search_command([]) == 0
+    assert capsys.readouterr().out == "module-a (alias-a) - Module A\n"
+
+    assert search_command(["missing"]) == 1
+    assert search_command(["dangling"]) == 1
+    assert capsys.readouterr().out == ""
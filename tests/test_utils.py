@@ -1,4 +1,16 @@
-from cfbs.utils import canonify, merge_json, loads_bundlenames
+import os
+from collections import OrderedDict
+
+from cfbs.utils import (
+    canonify,
+    merge_json,
+    loads_bundlenames,
+    parse_json,
+    copy_json,
+    cp_tree,
+    write_json,
+)
+from cfbs.build import _walk_files
 
 
 def test_canonify():
@@ -83,3 +95,98 @@ bundle agent doofus
     assert len(bundles) == 2
     assert bundles[0] == "bogus"
     assert bundles[1] == "doofus"
+
+
+def test_parse_json():
+    data = '{"b": [1, 2.5, true, null], "a": {"c": "d"}}'
+    parsed = parse_json(data)
+    assert type(parsed) is OrderedDict
+    assert type(parsed["a"]) is OrderedDict
+    assert list(parsed.keys()) == ["b", "a"]
+    assert parsed == {"b": [1, 2.5, True, None], "a": {"c": "d"}}
+
+    # Plain dicts (possibly parsed by orjson) still keep the order of keys:
+    parsed = parse_json(data.encode("utf-8"), ordered_dict=False)
+    assert list(parsed.keys()) == ["b", "a"]
+    assert parsed == {"b": [1, 2.5, True, None], "a": {"c": "d"}}
+
+    for ordered_dict in (True, False):
+        try:
+            parse_json("{broken", ordered_dict)
+        except ValueError:
+            pass
+        else:
+            assert False, "Invalid JSON should raise ValueError"
+
+
+def test_copy_json():
+    original = OrderedDict(b=[1, {"c": "d"}], a=None)
+    copy = copy_json(original)
+    assert copy == original
+    assert list(copy.keys()) == ["b", "a"]
+    copy["b"][1]["c"] = "e"
+    copy["b"].append(2)
+    assert original == {"b": [1, {"c": "d"}], "a": None}
+
+
+def test_cp_tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.cf").write_text("a")
+    (src / "sub" / "b.cf").write_text("b")
+    dst = tmp_path / "out" / "dst"
+
+    cp_tree(str(src), str(dst))
+    assert (dst / "a.cf").read_text() == "a"
+    assert (dst / "sub" / "b.cf").read_text() == "b"
+
+    # Copying again into an existing directory overwrites the files:
+    (src / "a.cf").write_text("c")
+    cp_tree(str(src), str(dst))
+    assert (dst / "a.cf").read_text() == "c"
+
+
+def test_walk_files(tmp_path):
+    (tmp_path / "sub" / "deeper").mkdir(parents=True)
+    (tmp_path / "a.cf").write_text("a")
+    (tmp_path / "sub" / "b.cf").write_text("b")
+    (tmp_path / "sub" / "deeper" / "c.cf").write_text("c")
+    os.symlink(str(tmp_path / "a.cf"), str(tmp_path / "link.cf"))
+    os.symlink(str(tmp_path / "sub"), str(tmp_path / "linked_dir"))
+
+    walked = {
+        os.path.relpath(directory, str(tmp_path)): sorted(files)
+        for directory, files in _walk_files(str(tmp_path))
+    }
+    # Symlinks (to files or directories) are skipped:
+    assert walked == {
+        ".": ["a.cf"],
+        "sub": ["b.cf"],
+        os.path.join("sub", "deeper"): ["c.cf"],
+    }
+
+
+def test_write_json(tmp_path):
+    path = tmp_path / "sub" / "def.json"
+    write_json(str(path), {"a": 1})
+    assert path.read_text() == '{\n  "a": 1\n}\n'
+
+    # The mode of the existing file is kept, and symlinks are written through:
+    os.chmod(str(path), 0o600)
+    link = tmp_path / "link.json"
+    os.symlink(str(path), str(link))
+    write_json(str(link), {"a": 2})
+    assert os.path.islink(str(link))
+    assert path.read_text() == '{\n  "a": 2\n}\n'
+    assert os.stat(str(path)).st_mode & 0o777 == 0o600
+
+    # A failed write does not leave the temporary file behind:
+    directory = tmp_path / "directory"
+    directory.mkdir()
+    try:
+        write_json(str(directory), {"a": 3})
+    except OSError:
+        pass
+    else:
+        assert False, "Replacing a directory should fail"
+    assert sorted(os.listdir(str(tmp_path))) == ["directory", "link.json", "sub"]